@@ -1,16 +1,19 @@
+import hashlib
 import os
+import threading
+import time
 from datetime import datetime, timedelta
-from typing import Optional, Generator
+from typing import Optional
 
-from jose import jwt, JWTError
-from passlib.context import CryptContext
+from cachetools import TTLCache
+import jwt
+from jwt import PyJWTError
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from database import SessionLocal
-import crud  # uses your crud.get_user_by_email / verify_password
-import models
+from database import get_db
+import crud  # get_user_by_email, redis_client
 from schemas import TokenData
 
 # -- config (use env vars in production) --
@@ -18,23 +21,60 @@ SECRET_KEY = os.getenv("SECRET_KEY", "change_this_to_a_random_secret_key_please"
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "1440"))  # 24h by default
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")  # token endpoint
 
-# Dependency: DB session generator
-def get_db() -> Generator[Session, None, None]:
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Short-lived cache of verified tokens -> (user, exp), so most requests skip
+# the users lookup. Keyed by a BLAKE2b digest of the token so raw bearer
+# tokens are never held in memory; the TTL bounds how long a
+# deleted/deactivated user keeps access.
+TOKEN_CACHE_TTL_SECONDS = int(os.getenv("TOKEN_CACHE_TTL_SECONDS", "30"))
+_token_cache = TTLCache(maxsize=10_000, ttl=TOKEN_CACHE_TTL_SECONDS)
+_token_cache_lock = threading.Lock()
+
+# Tokens logged out before they expire, kept for a full token lifetime so a
+# revoked token can't come back once evicted. With REDIS_URL set they are
+# also stored in Redis (until the token's own exp) so a logout reaches
+# every worker, not just the one that handled it.
+_revoked_tokens = TTLCache(maxsize=100_000, ttl=ACCESS_TOKEN_EXPIRE_MINUTES * 60)
+
+def _token_key(token: str) -> bytes:
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+def _revoked_redis_key(key: bytes) -> str:
+    return f"{crud.REDIS_KEY_PREFIX}:revoked:{key.hex()}"
 
-# Password helpers (if you need them here)
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+async def revoke_token(token: str) -> None:
+    """Reject a valid token for the rest of its life.
 
-def verify_password(plain: str, hashed: str) -> bool:
-    return pwd_context.verify(plain, hashed)
+    Only verified tokens are recorded, so junk bearer strings can't flood
+    the revocation cache and evict real logouts.
+    """
+    try:
+        payload = _decode_payload(token)
+    except PyJWTError:
+        raise _credentials_exception()
+    key = _token_key(token)
+    with _token_cache_lock:
+        _token_cache.pop(key, None)
+        _revoked_tokens[key] = True
+    if crud.redis_client is not None:
+        ttl = max(1, int(payload["exp"] - time.time()))
+        try:
+            await crud.redis_client.set(_revoked_redis_key(key), 1, ex=ttl)
+        except Exception as e:
+            print(f"⚠️ Redis revoke failed, logout applies to this worker only: {e}")
+
+async def _is_revoked(key: bytes) -> bool:
+    with _token_cache_lock:
+        if key in _revoked_tokens:
+            return True
+    if crud.redis_client is None:
+        return False
+    try:
+        return bool(await crud.redis_client.exists(_revoked_redis_key(key)))
+    except Exception as e:
+        print(f"⚠️ Redis revocation check failed: {e}")
+        return False
 
 # Create JWT access token
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -44,34 +84,61 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+# Built once rather than per request. Claims every access token must carry are
+# enforced by the verified decode itself.
+_ALGORITHMS = [ALGORITHM]
+_DECODE_OPTIONS = {"require": ["sub", "exp"]}
+
+def _decode_payload(token: str) -> dict:
+    return jwt.decode(token, SECRET_KEY, algorithms=_ALGORITHMS, options=_DECODE_OPTIONS)
+
 # Decode and return TokenData
 def decode_token(token: str) -> TokenData:
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise JWTError("Missing sub")
-        return TokenData(email=email)
-    except JWTError as e:
-        raise
-
-# Main dependency used in routes
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    credentials_exception = HTTPException(
+    return TokenData(email=_decode_payload(token)["sub"])
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials (token invalid or expired)",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+# Dependency for routes that need the full User row
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
+    credentials_exception = _credentials_exception()
+    key = _token_key(token)
+    if await _is_revoked(key):
+        raise credentials_exception
+    with _token_cache_lock:
+        cached = _token_cache.get(key)
+    if cached is not None:
+        user, exp = cached
+        if exp > time.time():
+            return user
+
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: Optional[str] = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-        token_data = TokenData(email=email)
-    except JWTError:
+        payload = _decode_payload(token)
+    except PyJWTError:
         raise credentials_exception
 
-    user = crud.get_user_by_email(db, token_data.email)
+    user = await crud.get_user_by_email(db, payload["sub"])
     if user is None:
         raise credentials_exception
+    with _token_cache_lock:
+        _token_cache[key] = (user, payload["exp"])
     return user
+
+# Main dependency used in routes: most only need the owner id, which the
+# token carries as "uid", so this skips the users lookup entirely
+async def get_current_user_id(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)) -> int:
+    if await _is_revoked(_token_key(token)):
+        raise _credentials_exception()
+    try:
+        payload = _decode_payload(token)
+    except PyJWTError:
+        raise _credentials_exception()
+    uid = payload.get("uid")
+    if isinstance(uid, int):
+        return uid
+    # tokens issued before "uid" was added still resolve through the row
+    return (await get_current_user(token, db)).id
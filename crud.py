@@ -1,13 +1,17 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
-import models, schemas
+import os
+import re
+import json
+import threading
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, or_, exists, func, select, insert, update, delete, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+import models, schemas, embeddings
 from typing import Optional
-from passlib.context import CryptContext
+from cachetools import TTLCache
+from security import hash_password, verify_and_update, verify_dummy
 
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
-
-# Guard against extremely large passwords (in bytes). pbkdf2_sha256 does not
-# have bcrypt's 72-byte limit, so allow reasonably long passwords but prevent
+# Guard against extremely large passwords (in bytes). bcrypt_sha256 pre-hashes
+# with SHA-256, so bcrypt's 72-byte truncation does not apply, but still prevent
 # abuse by enforcing a maximum.
 MAX_PASSWORD_BYTES = 4096
 
@@ -18,129 +22,457 @@ def _ensure_password_ok(password: str):
     if len(b) > MAX_PASSWORD_BYTES:
         raise ValueError(f"Password is too long ({len(b)} bytes). Please choose a shorter password.")
 
+# Searches shorter than MIN_SEARCH_TERM_LENGTH match everything, so they
+# short-circuit to a plain listing. Tokens shorter than MIN_FTS_TERM_LENGTH
+# fall back to substring matching; full-text search only matches word
+# prefixes, which is too coarse for one or two characters.
+MIN_SEARCH_TERM_LENGTH = 2
+MIN_FTS_TERM_LENGTH = 3
+# Plain words (letters and digits only), safe inside a tsquery quote
+_WORD_RE = re.compile(r"[^\W_]+")
+
+def _escape_like(token: str) -> str:
+    # typed % and _ are literal characters, not LIKE wildcards
+    return token.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+# lower(col) expressions for the substring search, built once at import
+_LOWER_SEARCH_COLUMNS = tuple(func.lower(getattr(models.Item, col)) for col in models.SEARCH_COLUMNS)
+
+# Per-user room/category aggregates. They only change when that user's items
+# change, so mutators below drop the user's entries instead of waiting on TTL.
+# With REDIS_URL set the cache lives in Redis instead, so every worker sees
+# the same entries and an invalidation on one worker reaches all of them.
+AGG_CACHE_TTL_SECONDS = int(os.getenv("AGG_CACHE_TTL_SECONDS", "60"))
+_agg_cache = TTLCache(maxsize=10_000, ttl=AGG_CACHE_TTL_SECONDS)
+_agg_cache_lock = threading.Lock()
+_AGG_KINDS = ("rooms", "categories", "summary")
+
+REDIS_URL = os.getenv("REDIS_URL")
+REDIS_KEY_PREFIX = "hi"
+redis_client = None
+if REDIS_URL:
+    import redis.asyncio as aioredis
+    # from_url connects lazily, so importing crud never blocks on Redis
+    redis_client = aioredis.from_url(REDIS_URL, decode_responses=True)
+
+def _agg_key(owner_id: int, kind: str) -> str:
+    return f"{REDIS_KEY_PREFIX}:agg:{owner_id}:{kind}"
+
+async def _cached_aggregate(owner_id: int, kind: str, compute):
+    if redis_client is not None:
+        return await _redis_cached_aggregate(owner_id, kind, compute)
+    key = (owner_id, kind)
+    with _agg_cache_lock:
+        value = _agg_cache.get(key)
+    if value is None:
+        value = await compute()
+        with _agg_cache_lock:
+            _agg_cache[key] = value
+    return value
+
+async def _redis_cached_aggregate(owner_id: int, kind: str, compute):
+    key = _agg_key(owner_id, kind)
+    try:
+        cached = await redis_client.get(key)
+    except Exception as e:
+        # a Redis outage degrades to uncached queries, not failed requests
+        print(f"⚠️ Redis get failed, querying database: {e}")
+        return await compute()
+    if cached is not None:
+        return json.loads(cached)
+    value = await compute()
+    try:
+        await redis_client.set(key, json.dumps(value), ex=AGG_CACHE_TTL_SECONDS)
+    except Exception as e:
+        print(f"⚠️ Redis set failed: {e}")
+    return value
+
+async def invalidate_aggregates(owner_id: int | None):
+    if owner_id is None:
+        return
+    if redis_client is not None:
+        try:
+            await redis_client.delete(*(_agg_key(owner_id, kind) for kind in _AGG_KINDS))
+        except Exception as e:
+            print(f"⚠️ Redis invalidation failed, entries expire in {AGG_CACHE_TTL_SECONDS}s: {e}")
+        return
+    with _agg_cache_lock:
+        for kind in _AGG_KINDS:
+            _agg_cache.pop((owner_id, kind), None)
+
 # ---------------- User helpers ----------------
 
-def get_user_by_email(db: Session, email: str) -> Optional[models.User]:
-    return db.query(models.User).filter(models.User.email == email).first()
+async def get_user_by_email(db: AsyncSession, email: str) -> Optional[models.User]:
+    return await db.scalar(select(models.User).where(models.User.email == email))
 
-def get_user(db: Session, user_id: int) -> Optional[models.User]:
-    return db.query(models.User).filter(models.User.id == user_id).first()
+async def get_user(db: AsyncSession, user_id: int) -> Optional[models.User]:
+    return await db.get(models.User, user_id)
 
-def create_user(db: Session, user_in: schemas.UserCreate) -> models.User:
+async def create_user(db: AsyncSession, user_in: schemas.UserCreate) -> Optional[models.User]:
+    """Insert a user in one round-trip; returns None if the email is taken."""
     # validate password size first
     _ensure_password_ok(user_in.password)
-    hashed = pwd_context.hash(user_in.password)   # passlib handles bcrypt_sha256
-    db_user = models.User(
-        email=user_in.email,
-        hashed_password=hashed,
-        full_name=getattr(user_in, "full_name", None),
-        is_active=True
+    hashed = await hash_password(user_in.password)
+    stmt = (
+        pg_insert(models.User)
+        .values(
+            email=user_in.email,
+            hashed_password=hashed,
+            full_name=getattr(user_in, "full_name", None),
+            is_active=True
+        )
+        .on_conflict_do_nothing(index_elements=["email"])
+        .returning(models.User)
     )
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    db_user = (await db.execute(stmt)).scalar_one_or_none()
+    await db.commit()
     return db_user
 
-def authenticate_user(db: Session, email: str, plain_password: str) -> Optional[models.User]:
-    user = get_user_by_email(db, email)
-    if not user:
-        return None
+async def authenticate_user(db: AsyncSession, email: str, plain_password: str) -> Optional[models.User]:
     try:
         _ensure_password_ok(plain_password)
     except ValueError:
         return None
-    if not pwd_context.verify(plain_password, user.hashed_password):
+    user = await get_user_by_email(db, email)
+    if not user:
+        await verify_dummy(plain_password)
+        return None
+    valid, new_hash = await verify_and_update(plain_password, user.hashed_password)
+    if not valid:
         return None
+    if new_hash:
+        # transparently upgrade legacy pbkdf2 / low-cost hashes
+        await db.execute(
+            update(models.User)
+            .where(models.User.id == user.id)
+            .values(hashed_password=new_hash)
+        )
+        await db.commit()
     return user
 
-def update_password(db: Session, user: models.User, new_password: str) -> models.User:
+async def update_password(db: AsyncSession, user: models.User, new_password: str) -> models.User:
     _ensure_password_ok(new_password)
-    user.hashed_password = pwd_context.hash(new_password)
-    db.add(user)
-    db.commit()
-    db.refresh(user)
-    return user
+    hashed = await hash_password(new_password)
+    stmt = (
+        update(models.User)
+        .where(models.User.id == user.id)
+        .values(hashed_password=hashed)
+        .returning(models.User)
+    )
+    db_user = (await db.execute(stmt)).scalar_one()
+    await db.commit()
+    return db_user
 
-def get_items(db: Session, owner_id: int | None = None, skip: int = 0, limit: int = 100):
-    q = db.query(models.Item)
+# Listings select plain columns rather than Item entities: the rows go
+# straight into the response schema, so ORM identity-map and attribute
+# bookkeeping would be wasted work.
+# Columns backing schemas.ItemOut
+ITEM_OUT_COLUMNS = tuple(getattr(models.Item, name) for name in schemas.ItemOut.model_fields)
+# Columns backing schemas.ItemListOut; compact listings select only these
+ITEM_LIST_COLUMNS = (
+    models.Item.id,
+    models.Item.name,
+    models.Item.category,
+    models.Item.room,
+    models.Item.image_path,
+)
+
+def _item_conditions(owner_id: int | None, room: str | None, category: str | None) -> list:
+    conditions = []
     if owner_id is not None:
-        q = q.filter(models.Item.owner_id == owner_id)
-    return q.offset(skip).limit(limit).all()
+        conditions.append(models.Item.owner_id == owner_id)
+    if room is not None:
+        conditions.append(models.Item.room == room)
+    if category is not None:
+        conditions.append(models.Item.category == category)
+    return conditions
+
+async def get_items(
+    db: AsyncSession,
+    owner_id: int | None = None,
+    skip: int = 0,
+    limit: int = 100,
+    room: str | None = None,
+    category: str | None = None,
+    compact: bool = False,
+    after_id: int | None = None,
+):
+    """List items ordered by id.
+
+    Pass the last id of the previous page as after_id to page by keyset
+    (an index seek on (owner_id, id)) instead of OFFSET, which has to
+    walk every skipped row.
+    """
+    columns = ITEM_LIST_COLUMNS if compact else ITEM_OUT_COLUMNS
+    stmt = select(*columns).where(*_item_conditions(owner_id, room, category))
+    if after_id is not None:
+        stmt = stmt.where(models.Item.id > after_id)
+    stmt = stmt.order_by(models.Item.id).offset(skip).limit(limit)
+    return (await db.execute(stmt)).mappings().all()
 
-def get_item(db: Session, item_id: int, owner_id: int | None = None):
-    q = db.query(models.Item).filter(models.Item.id == item_id)
+async def count_items(
+    db: AsyncSession,
+    owner_id: int | None = None,
+    room: str | None = None,
+    category: str | None = None,
+) -> int:
+    stmt = select(func.count(models.Item.id)).where(*_item_conditions(owner_id, room, category))
+    return await db.scalar(stmt)
+
+async def get_item(db: AsyncSession, item_id: int, owner_id: int | None = None):
+    stmt = select(models.Item).where(models.Item.id == item_id)
     if owner_id is not None:
-        q = q.filter(models.Item.owner_id == owner_id)
-    return q.first()
+        stmt = stmt.where(models.Item.owner_id == owner_id)
+    return await db.scalar(stmt)
 
-def search_items(db: Session, search_term: str | None = None, owner_id: int | None = None, mode: str = 'text'):
+async def search_items(db: AsyncSession, search_term: str | None = None, owner_id: int | None = None, mode: str = 'text', skip: int = 0, limit: int = 100):
     """Search items by text or return images when mode='image'.
     If search_term is provided and mode='text', search across several fields.
     """
     if mode == 'image':
-        q = db.query(models.Item).filter(models.Item.image_path.isnot(None))
-        if owner_id is not None:
-            q = q.filter(models.Item.owner_id == owner_id)
-        return q.all()
-
-    # text search
-    search_pattern = f"%{search_term or ''}%"
-    q = db.query(models.Item).filter(
-        or_(
-            models.Item.name.ilike(search_pattern),
-            models.Item.category.ilike(search_pattern),
-            models.Item.room.ilike(search_pattern),
-            models.Item.cupboard.ilike(search_pattern),
-            models.Item.shelf.ilike(search_pattern),
-            models.Item.notes.ilike(search_pattern),
-            models.Item.image_name.ilike(search_pattern)
+        # photographed: a primary image or any extra item_images row
+        condition = or_(
+            models.Item.image_path.isnot(None),
+            exists().where(models.ItemImage.item_id == models.Item.id),
         )
+        # with embeddings available, rank photographed items by similarity
+        vector = None
+        if await _embeddings_ready(db):
+            vector = await embeddings.embed_query(search_term or "", redis=redis_client)
+        if vector:
+            return await _nearest_items(db, vector, condition, owner_id, skip, limit)
+        return await _filter_items(db, condition, owner_id, skip, limit)
+
+    term = (search_term or "").strip().lower()
+    if len(term) < MIN_SEARCH_TERM_LENGTH:
+        return await get_items(db, owner_id=owner_id, skip=skip, limit=limit)
+
+    tokens = term.split()
+    # the parser keeps "photo.jpg", "3.5mm" or "a@b.com" whole (host, float,
+    # email lexemes), so only plain words are safe to split into prefixes
+    if all(len(token) >= MIN_FTS_TERM_LENGTH and _WORD_RE.fullmatch(token) for token in tokens):
+        # prefix full-text match against the GIN-indexed search_tsv column:
+        # 'lam':* & 'scr':* keeps partial-word matches ("lam" finds "Lamp")
+        tsquery = " & ".join(f"'{token}':*" for token in tokens)
+        condition = models.Item.search_tsv.op("@@")(func.to_tsquery("simple", tsquery))
+    else:
+        # short or non-word tokens: every token must appear in some column,
+        # via lower(col) LIKE; the trigram indexes only narrow on tokens of
+        # 3+ characters, so all-short queries ("tv") scan the owner's rows
+        condition = and_(*(
+            or_(*(column.like(f"%{_escape_like(token)}%", escape="\\") for column in _LOWER_SEARCH_COLUMNS))
+            for token in tokens
+        ))
+    return await _filter_items(db, condition, owner_id, skip, limit)
+
+async def _filter_items(db: AsyncSession, condition, owner_id: int | None, skip: int, limit: int):
+    stmt = select(*ITEM_OUT_COLUMNS).where(condition)
+    if owner_id is not None:
+        stmt = stmt.where(models.Item.owner_id == owner_id)
+    stmt = stmt.order_by(models.Item.id).offset(skip).limit(limit)
+    return (await db.execute(stmt)).mappings().all()
+
+async def _nearest_items(db: AsyncSession, vector: list[float], condition, owner_id: int | None, skip: int, limit: int):
+    # A user's photographed items are a small set, so rank them exactly. The
+    # shared HNSW index would return at most hnsw.ef_search rows across all
+    # users before the owner filter, giving short or empty pages; the
+    # MATERIALIZED CTE keeps the planner from serving ORDER BY from it.
+    candidates = (
+        select(
+            *ITEM_OUT_COLUMNS,
+            models.ItemEmbedding.embedding.cosine_distance(vector).label("distance"),
+        )
+        # outer join: items not embedded yet still show up, ranked last
+        .outerjoin(models.ItemEmbedding, models.ItemEmbedding.item_id == models.Item.id)
+        .where(condition)
     )
     if owner_id is not None:
-        q = q.filter(models.Item.owner_id == owner_id)
-    return q.all()
+        candidates = candidates.where(models.Item.owner_id == owner_id)
+    candidates = candidates.cte("candidates").prefix_with("MATERIALIZED")
+    stmt = (
+        select(*(candidates.c[column.key] for column in ITEM_OUT_COLUMNS))
+        .order_by(candidates.c.distance.nulls_last(), candidates.c.id)
+        .offset(skip)
+        .limit(limit)
+    )
+    return (await db.execute(stmt)).mappings().all()
+
+async def _count_by(db: AsyncSession, column, owner_id: int) -> list[dict]:
+    # blank names are dropped in SQL, so rows map straight onto the response
+    stmt = (
+        select(column.label("name"), func.count(models.Item.id).label("count"))
+        .where(models.Item.owner_id == owner_id, column.isnot(None), column != "")
+        .group_by(column)
+    )
+    return [dict(row) for row in (await db.execute(stmt)).mappings()]
 
-def create_item(db: Session, item: schemas.ItemCreate, owner_id: int | None = None):
+async def get_room_counts(db: AsyncSession, owner_id: int) -> list[dict]:
+    return await _cached_aggregate(owner_id, "rooms", lambda: _count_by(db, models.Item.room, owner_id))
+
+async def get_category_counts(db: AsyncSession, owner_id: int) -> list[dict]:
+    return await _cached_aggregate(owner_id, "categories", lambda: _count_by(db, models.Item.category, owner_id))
+
+async def _dashboard_summary(db: AsyncSession, owner_id: int) -> dict:
+    stmt = (
+        select(
+            models.Item.room,
+            models.Item.category,
+            func.grouping(models.Item.room),
+            func.count(models.Item.id),
+        )
+        .where(models.Item.owner_id == owner_id)
+        .group_by(func.grouping_sets(models.Item.room, models.Item.category))
+    )
+    rows = (await db.execute(stmt)).all()
+    rooms, categories = [], []
+    for room, category, room_grouped, count in rows:
+        # grouping(room) is 0 for rows of the room grouping set
+        if room_grouped == 0:
+            if room:
+                rooms.append({"name": room, "count": count})
+        elif category:
+            categories.append({"name": category, "count": count})
+    return {"rooms": rooms, "categories": categories}
+
+async def get_dashboard_summary(db: AsyncSession, owner_id: int) -> dict:
+    """Room and category counts for a user in a single GROUPING SETS pass."""
+    return await _cached_aggregate(owner_id, "summary", lambda: _dashboard_summary(db, owner_id))
+
+async def create_item(db: AsyncSession, item: schemas.ItemCreate, owner_id: int | None = None):
     payload = item.dict()
     if owner_id is not None:
         payload['owner_id'] = owner_id
-    db_item = models.Item(**payload)
-    db.add(db_item)
-    db.commit()
-    db.refresh(db_item)
+    db_item = (await db.execute(insert(models.Item).values(**payload).returning(models.Item))).scalar_one()
+    await db.commit()
+    await invalidate_aggregates(db_item.owner_id)
+    if db_item.image_path:
+        await embed_items(db, [db_item])
     return db_item
 
-def update_item(db: Session, item_id: int, item: schemas.ItemUpdate):
-    db_item = db.query(models.Item).filter(models.Item.id == item_id).first()
+async def create_items(db: AsyncSession, items: list[schemas.ItemCreate], owner_id: int | None = None) -> list[models.Item]:
+    """Insert many items in one batched INSERT ... RETURNING, in input order."""
+    if not items:
+        return []
+    payloads = [item.dict() for item in items]
+    if owner_id is not None:
+        for payload in payloads:
+            payload['owner_id'] = owner_id
+    stmt = insert(models.Item).returning(models.Item, sort_by_parameter_order=True)
+    db_items = (await db.scalars(stmt, payloads)).all()
+    await db.commit()
+    await invalidate_aggregates(owner_id)
+    # one embedding batch for every new item that already has a photo
+    await embed_items(db, [db_item for db_item in db_items if db_item.image_path])
+    return db_items
+
+async def update_item(db: AsyncSession, item_id: int, item: schemas.ItemUpdate, owner_id: int | None = None):
+    """Update an item in a single UPDATE ... RETURNING; None if not found/owned."""
+    values = item.dict(exclude_unset=True)
+    if not values:
+        return await get_item(db, item_id, owner_id=owner_id)
+    stmt = update(models.Item).where(models.Item.id == item_id)
+    if owner_id is not None:
+        stmt = stmt.where(models.Item.owner_id == owner_id)
+    # the frontend PUTs the whole form, so keep the embedded text to compare
+    # against and only re-embed when it actually changed
+    old_text = None
+    if values.keys() & set(embeddings.EMBEDDING_FIELDS) and await _embeddings_ready(db):
+        old_stmt = select(*(getattr(models.Item, field) for field in embeddings.EMBEDDING_FIELDS))
+        old_row = (await db.execute(old_stmt.where(stmt.whereclause))).first()
+        old_text = embeddings.item_text(old_row) if old_row else None
+    db_item = (await db.execute(stmt.values(**values).returning(models.Item))).scalar_one_or_none()
+    await db.commit()
     if db_item:
-        for key, value in item.dict(exclude_unset=True).items():
-            setattr(db_item, key, value)
-        db.commit()
-        db.refresh(db_item)
+        await invalidate_aggregates(db_item.owner_id)
+        if (
+            old_text is not None
+            and embeddings.item_text(db_item) != old_text
+            and await _is_photographed(db, db_item)
+        ):
+            await embed_items(db, [db_item])
     return db_item
 
 
-def attach_image_to_item(db: Session, item_id: int, image_name: str, image_path: str, owner_id: int | None = None):
+async def attach_image_to_item(db: AsyncSession, item_id: int, image_name: str, image_path: str, owner_id: int | None = None):
     """Attach uploaded image metadata to an existing item."""
-    q = db.query(models.Item).filter(models.Item.id == item_id)
+    stmt = update(models.Item).where(models.Item.id == item_id)
     if owner_id is not None:
-        q = q.filter(models.Item.owner_id == owner_id)
-    db_item = q.first()
-    if not db_item:
-        return None
-    db_item.image_name = image_name
-    db_item.image_path = image_path
-    db.add(db_item)
-    db.commit()
-    db.refresh(db_item)
+        stmt = stmt.where(models.Item.owner_id == owner_id)
+    stmt = stmt.values(image_name=image_name, image_path=image_path).returning(models.Item)
+    db_item = (await db.execute(stmt)).scalar_one_or_none()
+    await db.commit()
     return db_item
 
-def delete_item(db: Session, item_id: int, owner_id: int | None = None):
-    q = db.query(models.Item).filter(models.Item.id == item_id)
+async def add_item_images(db: AsyncSession, item_id: int, images: list[dict]) -> list[models.ItemImage]:
+    """Insert metadata for several uploaded images in one statement."""
+    rows = [{"item_id": item_id, **image} for image in images]
+    stmt = insert(models.ItemImage).values(rows).returning(models.ItemImage)
+    db_images = (await db.scalars(stmt)).all()
+    await db.commit()
+    return db_images
+
+async def get_item_images(db: AsyncSession, item_id: int) -> list[models.ItemImage]:
+    stmt = select(models.ItemImage).where(models.ItemImage.item_id == item_id).order_by(models.ItemImage.id)
+    return (await db.scalars(stmt)).all()
+
+# Whether item_embeddings exists: init_db skips it when the vector extension
+# is unavailable, even if sentence-transformers is installed. Checked once.
+_embedding_table_ready: bool | None = None
+
+async def _embeddings_ready(db: AsyncSession) -> bool:
+    global _embedding_table_ready
+    if not embeddings.available():
+        return False
+    if _embedding_table_ready is None:
+        if db.get_bind().dialect.name != "postgresql":
+            _embedding_table_ready = False
+        else:
+            _embedding_table_ready = bool(
+                await db.scalar(text("SELECT to_regclass('item_embeddings') IS NOT NULL"))
+            )
+        if not _embedding_table_ready:
+            print("⚠️ item_embeddings table missing, semantic image search disabled")
+    return _embedding_table_ready
+
+async def _is_photographed(db: AsyncSession, item: models.Item) -> bool:
+    """Whether image search can return the item (see search_items)."""
+    if item.image_path:
+        return True
+    return bool(await db.scalar(select(exists().where(models.ItemImage.item_id == item.id))))
+
+async def embed_items(db: AsyncSession, items) -> None:
+    """Store semantic search vectors for items; a no-op without embeddings.
+
+    Best effort: callers have already committed the item itself, so a
+    failure here is logged rather than failing the request.
+    """
+    if not items or not await _embeddings_ready(db):
+        return
+    try:
+        vectors = await embeddings.embed_texts([embeddings.item_text(item) for item in items])
+        if not vectors:
+            return
+        stmt = pg_insert(models.ItemEmbedding).values([
+            {"item_id": item.id, "embedding": vector}
+            for item, vector in zip(items, vectors)
+        ])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[models.ItemEmbedding.item_id],
+            set_={"embedding": stmt.excluded.embedding},
+        )
+        await db.execute(stmt)
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        print(f"⚠️ Embedding items failed: {e}")
+
+async def delete_item(db: AsyncSession, item_id: int, owner_id: int | None = None):
+    """Delete an item in a single DELETE ... RETURNING; None if not found/owned."""
+    stmt = delete(models.Item).where(models.Item.id == item_id)
     if owner_id is not None:
-        q = q.filter(models.Item.owner_id == owner_id)
-    db_item = q.first()
+        stmt = stmt.where(models.Item.owner_id == owner_id)
+    db_item = (await db.execute(stmt.returning(models.Item))).scalar_one_or_none()
+    await db.commit()
     if db_item:
-        db.delete(db_item)
-        db.commit()
+        await invalidate_aggregates(db_item.owner_id)
     return db_item
\ No newline at end of file
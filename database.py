@@ -1,7 +1,11 @@
 import os
+from uuid import uuid4
+from typing import AsyncGenerator
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
+from sqlalchemy.pool import NullPool
 
 load_dotenv()
 
@@ -9,15 +13,67 @@ Base = declarative_base()
 
 _engine = None
 
+# Pool sizing; defaults (5 + 10 overflow) starve a busy FastAPI app.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+# Set when DATABASE_URL points at pgbouncer/Supavisor in transaction mode:
+# the bouncer already pools, so SQLAlchemy should not hold connections.
+DB_PGBOUNCER = os.getenv("DB_PGBOUNCER") == "1"
+DB_STATEMENT_TIMEOUT_MS = os.getenv("DB_STATEMENT_TIMEOUT_MS")
+
+def _async_url(database_url: str):
+    """Point a plain postgres:// URL at the asyncpg driver."""
+    url = make_url(database_url)
+    if url.drivername in ("postgres", "postgresql", "postgresql+psycopg2", "postgresql+psycopg"):
+        url = url.set(drivername="postgresql+asyncpg")
+    # asyncpg spells libpq's sslmode as ssl
+    if "sslmode" in url.query:
+        url = url.update_query_dict({"ssl": url.query["sslmode"]}).difference_update_query(["sslmode"])
+    return url
+
+def _engine_kwargs() -> dict:
+    kwargs = {"pool_pre_ping": True}
+    connect_args = {}
+    if DB_PGBOUNCER:
+        kwargs["poolclass"] = NullPool
+        # transaction pooling can't keep server-side prepared statements, and
+        # asyncpg's sequential __asyncpg_stmt_N__ names collide across the
+        # bouncer's shared backends, so give every statement a unique name
+        connect_args["statement_cache_size"] = 0
+        connect_args["prepared_statement_cache_size"] = 0
+        connect_args["prepared_statement_name_func"] = lambda: f"__asyncpg_{uuid4()}__"
+    else:
+        kwargs.update(
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+        )
+    if DB_STATEMENT_TIMEOUT_MS:
+        connect_args["server_settings"] = {"statement_timeout": DB_STATEMENT_TIMEOUT_MS}
+    if connect_args:
+        kwargs["connect_args"] = connect_args
+    return kwargs
+
 def get_engine():
     global _engine
     if _engine is None:
         database_url = os.getenv("DATABASE_URL")
         if not database_url:
             raise RuntimeError("DATABASE_URL environment variable is not set")
-        _engine = create_engine(database_url, pool_pre_ping=True)
+        _engine = create_async_engine(_async_url(database_url), **_engine_kwargs())
     return _engine
 
 engine = get_engine()
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
\ No newline at end of file
+# expire_on_commit=False keeps rows returned by UPDATE/DELETE ... RETURNING
+# usable after commit without a follow-up SELECT (and without lazy loads,
+# which AsyncSession can't do implicitly)
+SessionLocal = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+# Dependency: one AsyncSession per request
+async def get_db() -> AsyncGenerator[AsyncSession, None]:
+    async with SessionLocal() as db:
+        yield db
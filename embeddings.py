@@ -0,0 +1,96 @@
+"""Optional sentence embeddings for semantic search over items with photos.
+
+Needs the sentence-transformers package, which is not in requirements.txt
+because it pulls in torch. Without it (or with EMBEDDINGS_ENABLED=0) the
+helpers here return None and search falls back to plain filtering.
+"""
+import asyncio
+import hashlib
+import json
+import os
+import threading
+
+from cachetools import LRUCache
+
+try:
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    SentenceTransformer = None
+
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+# must match the model's output size and models.ItemEmbedding.embedding
+EMBEDDING_DIM = 384
+
+# Item fields that describe what a photo shows
+EMBEDDING_FIELDS = ("name", "category", "room", "inside_items", "notes", "image_name")
+
+_model = None
+_model_lock = threading.Lock()
+
+# Search queries repeat a lot, so their vectors are kept in-process and,
+# when a Redis client is passed in, shared across workers and restarts.
+QUERY_CACHE_SIZE = 4096
+QUERY_CACHE_TTL_SECONDS = 24 * 3600
+_query_cache = LRUCache(maxsize=QUERY_CACHE_SIZE)
+_query_cache_lock = threading.Lock()
+
+def available() -> bool:
+    return SentenceTransformer is not None and os.getenv("EMBEDDINGS_ENABLED", "1") == "1"
+
+def _get_model():
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                _model = SentenceTransformer(EMBEDDING_MODEL)
+    return _model
+
+def _encode(texts: list[str]) -> list[list[float]]:
+    # unit-length vectors, so cosine distance is a plain dot product
+    return _get_model().encode(texts, normalize_embeddings=True).tolist()
+
+def item_text(item) -> str:
+    return " ".join(str(v) for v in (getattr(item, f, None) for f in EMBEDDING_FIELDS) if v)
+
+async def embed_texts(texts: list[str]) -> list[list[float]] | None:
+    """Embed texts off the event loop; None when embeddings are unavailable."""
+    if not available() or not texts:
+        return None
+    return await asyncio.to_thread(_encode, texts)
+
+def _query_key(query: str) -> str:
+    # the model is part of the key so switching models can't serve old vectors
+    digest = hashlib.sha256(f"{EMBEDDING_MODEL}\0{query}".encode()).hexdigest()
+    return f"hi:emb:{digest}"
+
+async def embed_query(query: str, redis=None) -> list[float] | None:
+    """Embed a search query, reusing cached vectors for repeat queries."""
+    if not available():
+        return None
+    query = " ".join(query.lower().split())
+    if not query:
+        return None
+    with _query_cache_lock:
+        vector = _query_cache.get(query)
+    if vector is not None:
+        return vector
+
+    key = _query_key(query)
+    if redis is not None:
+        try:
+            cached = await redis.get(key)
+        except Exception as e:
+            print(f"⚠️ Redis get failed, embedding query: {e}")
+            cached = None
+        if cached is not None:
+            vector = json.loads(cached)
+    if vector is None:
+        vector = (await embed_texts([query]))[0]
+        if redis is not None:
+            try:
+                await redis.set(key, json.dumps(vector), ex=QUERY_CACHE_TTL_SECONDS)
+            except Exception as e:
+                print(f"⚠️ Redis set failed: {e}")
+    with _query_cache_lock:
+        _query_cache[query] = vector
+    return vector
@@ -2,7 +2,9 @@ from dotenv import load_dotenv
 load_dotenv()
 
 import os
+import asyncio
 import shutil
+from contextlib import asynccontextmanager
 from uuid import uuid4
 from pathlib import Path as _Path
 from typing import Optional
@@ -12,21 +14,24 @@ from fastapi import (
     Depends,
     HTTPException,
     Query,
+    Body,
     Form,
     UploadFile,
-    File
+    File,
+    Request,
+    Response
 )
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import HTMLResponse, FileResponse
 from fastapi.staticfiles import StaticFiles
+from starlette.staticfiles import NotModifiedResponse
 
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from supabase import create_client
+import httpx
 
-import models, schemas, crud, auth
-from database import Base, engine, SessionLocal
+import schemas, crud, auth, security, migrate
+from database import get_db
 
 # --------------------------------------------------
 # Environment
@@ -38,25 +43,55 @@ SUPABASE_SERVICE_ROLE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
 if not SUPABASE_URL or not SUPABASE_SERVICE_ROLE_KEY:
     raise RuntimeError("Supabase environment variables are missing")
 
-supabase = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+# Uploads go straight to the Storage REST API so the request body can be
+# streamed in chunks instead of being read into memory first.
+STORAGE_UPLOAD_URL = f"{SUPABASE_URL.rstrip('/')}/storage/v1/object/uploads"
+STORAGE_HEADERS = {
+    "Authorization": f"Bearer {SUPABASE_SERVICE_ROLE_KEY}",
+    "apikey": SUPABASE_SERVICE_ROLE_KEY,
+}
+UPLOAD_CHUNK_SIZE = 64 * 1024
+# Files accepted by one multi-image upload, i.e. concurrent Storage uploads
+MAX_IMAGES_PER_UPLOAD = 10
+
+# Public object URLs are deterministic (base + filename), so the base is
+# built once here. STORAGE_PUBLIC_URL can point it at a CDN in front of
+# the bucket instead.
+PUBLIC_UPLOAD_BASE = (
+    os.getenv("STORAGE_PUBLIC_URL")
+    or f"{SUPABASE_URL.rstrip('/')}/storage/v1/object/public/uploads"
+).rstrip("/")
 
 BASE_DIR = _Path(__file__).resolve().parent
+STATIC_DIR = BASE_DIR / "static"
 
-# --------------------------------------------------
-# Database init
-# --------------------------------------------------
-
-try:
-    Base.metadata.create_all(bind=engine)
-    print("✅ Database tables created/verified successfully")
-except Exception as e:
-    print(f"⚠️ Database not reachable at startup: {e}")
+# Page paths resolved once at import instead of per request
+INDEX_PAGE = str(BASE_DIR / "index.html")
+LOGIN_PAGE = str(STATIC_DIR / "auth.html")
+SIGNUP_PAGE = str(STATIC_DIR / "signup-new.html")
 
 # --------------------------------------------------
 # App
 # --------------------------------------------------
 
-app = FastAPI(title="Home Inventory System", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # schema setup normally runs once per deploy via `python migrate.py`;
+    # RUN_MIGRATIONS=1 is for single-process hosts with one start command
+    if os.getenv("RUN_MIGRATIONS") == "1":
+        await migrate.upgrade()
+        print("✅ Database tables created/verified successfully")
+    # pay passlib's backend load and the hash worker spawn before the first login
+    await security.warm_up()
+    # one Storage client per app so uploads reuse TCP/TLS connections
+    app.state.http = httpx.AsyncClient(headers=STORAGE_HEADERS, timeout=60.0)
+    yield
+    await app.state.http.aclose()
+    security.HASH_POOL.shutdown(wait=False, cancel_futures=True)
+    if crud.redis_client is not None:
+        await crud.redis_client.aclose()
+
+app = FastAPI(title="Home Inventory System", version="1.0.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -64,217 +99,358 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count"],
 )
 
-# --------------------------------------------------
-# Dependencies
-# --------------------------------------------------
-
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+# Upper bound for skip/limit pagination on list endpoints
+MAX_PAGE_SIZE = 500
 
 # --------------------------------------------------
 # Frontend pages
 # --------------------------------------------------
 
+# HTML changes on deploy, so browsers revalidate it after a few minutes.
+# Everything else under /static is an upload with a random uuid name and
+# never changes, so it can be cached for good.
+PAGE_CACHE_CONTROL = "public, max-age=300"
+ASSET_CACHE_CONTROL = "public, max-age=31536000, immutable"
+_PAGE_HEADERS = {"Cache-Control": PAGE_CACHE_CONTROL}
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles (ETag/Last-Modified 304s built in) plus Cache-Control."""
+
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        is_page = os.fspath(full_path).endswith(".html")
+        response.headers["Cache-Control"] = PAGE_CACHE_CONTROL if is_page else ASSET_CACHE_CONTROL
+        return response
+
+static_files = CachedStaticFiles(directory=STATIC_DIR)
+
+def _page_response(path: str, request: Request) -> Response:
+    # FileResponse alone ignores If-None-Match/If-Modified-Since, so reuse
+    # the StaticFiles check to answer revalidations with a 304
+    response = FileResponse(path, headers=_PAGE_HEADERS, stat_result=os.stat(path))
+    if static_files.is_not_modified(response.headers, request.headers):
+        return NotModifiedResponse(response.headers)
+    return response
+
 @app.get("/", include_in_schema=False)
-def serve_frontend():
-    return FileResponse(BASE_DIR / "index.html")
+async def serve_frontend(request: Request):
+    return _page_response(INDEX_PAGE, request)
 
 @app.get("/auth/login-page", include_in_schema=False)
-def login_page():
-    return FileResponse(BASE_DIR / "static" / "auth.html")
+async def login_page(request: Request):
+    return _page_response(LOGIN_PAGE, request)
 
 @app.get("/auth/signup-page", include_in_schema=False)
-def signup_page():
-    return FileResponse(BASE_DIR / "static" / "signup-new.html")
+async def signup_page(request: Request):
+    return _page_response(SIGNUP_PAGE, request)
 
 @app.get("/favicon.ico", include_in_schema=False)
-def favicon():
+async def favicon():
     return HTMLResponse(status_code=204)
 
-app.mount("/static", StaticFiles(directory="static"), name="static")
+app.mount("/static", static_files, name="static")
 
 # --------------------------------------------------
 # Auth
 # --------------------------------------------------
 
 @app.post("/auth/signup", response_model=schemas.UserOut)
-def signup(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    existing = crud.get_user_by_email(db, user.email)
-    if existing:
+async def signup(user: schemas.UserCreate, db: AsyncSession = Depends(get_db)):
+    db_user = await crud.create_user(db, user)
+    if db_user is None:
         raise HTTPException(status_code=400, detail="Email already registered")
-    return crud.create_user(db, user)
+    return db_user
 
 @app.post("/auth/login", response_model=schemas.Token)
-def login(user: schemas.UserLogin, db: Session = Depends(get_db)):
-    db_user = crud.authenticate_user(db, user.email, user.password)
+async def login(user: schemas.UserLogin, db: AsyncSession = Depends(get_db)):
+    db_user = await crud.authenticate_user(db, user.email, user.password)
     if not db_user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
-    token = auth.create_access_token(data={"sub": db_user.email})
+    token = auth.create_access_token(data={"sub": db_user.email, "uid": db_user.id})
     return {"access_token": token, "token_type": "bearer"}
 
+@app.post("/auth/logout", response_model=schemas.Message)
+async def logout(token: str = Depends(auth.oauth2_scheme)):
+    await auth.revoke_token(token)
+    return {"message": "Logged out"}
+
 # --------------------------------------------------
 # Items
 # --------------------------------------------------
 
 @app.post("/items/", response_model=schemas.ItemOut)
-def create_item(
+async def create_item(
     item: schemas.ItemCreate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user_id: int = Depends(auth.get_current_user_id)
 ):
-    return crud.create_item(db, item, owner_id=current_user.id)
+    return await crud.create_item(db, item, owner_id=current_user_id)
 
-@app.get("/items/", response_model=list[schemas.ItemOut])
-def read_items(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+@app.post("/items/bulk", response_model=list[schemas.ItemOut])
+async def create_items_bulk(
+    items: list[schemas.ItemCreate] = Body(..., max_length=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db),
+    current_user_id: int = Depends(auth.get_current_user_id)
 ):
-    return crud.get_items(db, owner_id=current_user.id)
+    return await crud.create_items(db, items, owner_id=current_user_id)
+
+def _item_list(items, compact: bool):
+    # compact rows only carry ItemListOut's columns; validate them against
+    # that schema so the response union doesn't try ItemOut first
+    if compact:
+        return [schemas.ItemListOut.model_validate(i) for i in items]
+    return items
+
+@app.get("/items/", response_model=list[schemas.ItemOut] | list[schemas.ItemListOut])
+async def read_items(
+    compact: bool = Query(False),
+    db: AsyncSession = Depends(get_db),
+    current_user_id: int = Depends(auth.get_current_user_id)
+):
+    items = await crud.get_items(db, owner_id=current_user_id, compact=compact)
+    return _item_list(items, compact)
 
 @app.get("/items/{item_id}", response_model=schemas.ItemOut)
-def read_item(
+async def read_item(
     item_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user_id: int = Depends(auth.get_current_user_id)
 ):
-    item = crud.get_item(db, item_id, owner_id=current_user.id)
+    item = await crud.get_item(db, item_id, owner_id=current_user_id)
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
     return item
 
 @app.put("/items/{item_id}", response_model=schemas.ItemOut)
-def update_item(
+async def update_item(
     item_id: int,
     item: schemas.ItemUpdate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user_id: int = Depends(auth.get_current_user_id)
 ):
-    return crud.update_item(db, item_id, item)
+    db_item = await crud.update_item(db, item_id, item, owner_id=current_user_id)
+    if not db_item:
+        raise HTTPException(status_code=404, detail="Item not found")
+    return db_item
 
-@app.delete("/items/{item_id}")
-def delete_item(
+@app.delete("/items/{item_id}", response_model=schemas.Message)
+async def delete_item(
     item_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user_id: int = Depends(auth.get_current_user_id)
 ):
-    crud.delete_item(db, item_id, owner_id=current_user.id)
+    if not await crud.delete_item(db, item_id, owner_id=current_user_id):
+        raise HTTPException(status_code=404, detail="Item not found")
     return {"message": "Item deleted"}
 
 # --------------------------------------------------
 # Upload image → Supabase Storage
 # --------------------------------------------------
 
+async def _aiter_chunks(file: UploadFile, chunk_size: int = UPLOAD_CHUNK_SIZE):
+    while chunk := await file.read(chunk_size):
+        yield chunk
+
+async def _upload_to_storage(client: httpx.AsyncClient, file: UploadFile) -> str:
+    """Stream one upload to Supabase Storage and return its object name."""
+    # Generate filename
+    ext = os.path.splitext(file.filename or "")[1]
+    filename = f"{uuid4().hex}{ext}"
+
+    # Stream to Supabase Storage without blocking the event loop
+    headers = {"Content-Type": file.content_type or "application/octet-stream"}
+    if file.size is not None:
+        headers["Content-Length"] = str(file.size)
+    response = await client.post(
+        f"{STORAGE_UPLOAD_URL}/{filename}",
+        content=_aiter_chunks(file),
+        headers=headers,
+    )
+    if response.is_error:
+        raise HTTPException(status_code=502, detail="Image upload failed")
+    return filename
+
+async def _delete_from_storage(client: httpx.AsyncClient, filenames: list[str]) -> None:
+    """Best-effort removal of uploaded objects (one bulk delete call)."""
+    if not filenames:
+        return
+    try:
+        response = await client.request("DELETE", STORAGE_UPLOAD_URL, json={"prefixes": filenames})
+        response.raise_for_status()
+    except httpx.HTTPError as e:
+        print(f"⚠️ Could not remove orphaned uploads {filenames}: {e}")
+
 @app.post("/items/{item_id}/upload-image", response_model=schemas.ItemOut)
-def upload_item_image(
+async def upload_item_image(
+    request: Request,
     item_id: int,
     file: UploadFile = File(...),
     image_name: Optional[str] = Form(None),
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user_id: int = Depends(auth.get_current_user_id)
 ):
     # Ensure item belongs to user
-    item = crud.get_item(db, item_id, owner_id=current_user.id)
+    item = await crud.get_item(db, item_id, owner_id=current_user_id)
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
 
-    # Generate filename
-    ext = _Path(file.filename).suffix
-    filename = f"{uuid4().hex}{ext}"
-
-    # Read file bytes
-    file_bytes = file.file.read()
-
-    # Upload to Supabase Storage (NO result.get())
-    supabase.storage.from_("uploads").upload(
-        path=filename,
-        file=file_bytes,
-        file_options={
-            "content-type": file.content_type or "application/octet-stream"
-        },
-    )
-
-    # Build public URL
-    image_path = f"{SUPABASE_URL}storage/v1/object/public/uploads/{filename}"
+    filename = await _upload_to_storage(request.app.state.http, file)
+    image_path = f"{PUBLIC_UPLOAD_BASE}/{filename}"
 
     # Save in DB
-    updated_item = crud.attach_image_to_item(
+    updated_item = await crud.attach_image_to_item(
         db,
         item_id,
         image_name or file.filename,
         image_path,
-        owner_id=current_user.id
+        owner_id=current_user_id
     )
+    if updated_item:
+        await crud.embed_items(db, [updated_item])
 
     return updated_item
 
+@app.post("/items/{item_id}/images", response_model=list[schemas.ItemImageOut])
+async def upload_item_images(
+    request: Request,
+    item_id: int,
+    files: list[UploadFile] = File(..., max_length=MAX_IMAGES_PER_UPLOAD),
+    db: AsyncSession = Depends(get_db),
+    current_user_id: int = Depends(auth.get_current_user_id)
+):
+    item = await crud.get_item(db, item_id, owner_id=current_user_id)
+    if not item:
+        raise HTTPException(status_code=404, detail="Item not found")
+
+    # Uploads overlap, so the request takes as long as the slowest file. If
+    # one fails the TaskGroup cancels the rest, and the ones that already
+    # landed are deleted so no objects are left without item_images rows.
+    client = request.app.state.http
+    tasks = []
+    try:
+        async with asyncio.TaskGroup() as tg:
+            tasks = [tg.create_task(_upload_to_storage(client, f)) for f in files]
+    except* Exception:
+        stored = [t.result() for t in tasks if not t.cancelled() and t.exception() is None]
+        await _delete_from_storage(client, stored)
+        raise HTTPException(status_code=502, detail="Image upload failed")
+    image_paths = [f"{PUBLIC_UPLOAD_BASE}/{t.result()}" for t in tasks]
+
+    # One INSERT for all the metadata rows
+    images = await crud.add_item_images(
+        db,
+        item_id,
+        [
+            {"image_name": f.filename, "image_path": path}
+            for f, path in zip(files, image_paths)
+        ],
+    )
+    # the item is photographed now, so make it rankable in image search
+    await crud.embed_items(db, [item])
+    return images
+
+@app.get("/items/{item_id}/images", response_model=list[schemas.ItemImageOut])
+async def list_item_images(
+    item_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user_id: int = Depends(auth.get_current_user_id)
+):
+    item = await crud.get_item(db, item_id, owner_id=current_user_id)
+    if not item:
+        raise HTTPException(status_code=404, detail="Item not found")
+    return await crud.get_item_images(db, item_id)
+
 # --------------------------------------------------
 # Search / filters
 # --------------------------------------------------
 
 @app.get("/search/", response_model=list[schemas.ItemOut])
-def search_items(
+async def search_items(
     q: Optional[str] = Query(None),
     mode: str = Query("text"),
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db),
+    current_user_id: int = Depends(auth.get_current_user_id)
 ):
-    return crud.search_items(
+    return await crud.search_items(
         db,
         q,
-        owner_id=current_user.id,
-        mode=mode
+        owner_id=current_user_id,
+        mode=mode,
+        skip=skip,
+        limit=limit
     )
 
-@app.get("/rooms/list")
-def list_rooms(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+@app.get("/rooms/list", response_model=list[schemas.CountOut])
+async def list_rooms(
+    db: AsyncSession = Depends(get_db),
+    current_user_id: int = Depends(auth.get_current_user_id)
 ):
-    rows = (
-        db.query(models.Item.room, func.count(models.Item.id))
-        .filter(models.Item.owner_id == current_user.id)
-        .group_by(models.Item.room)
-        .all()
-    )
-    return [{"name": r[0], "count": r[1]} for r in rows if r[0]]
+    return await crud.get_room_counts(db, owner_id=current_user_id)
 
-@app.get("/categories/list")
-def list_categories(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+@app.get("/categories/list", response_model=list[schemas.CountOut])
+async def list_categories(
+    db: AsyncSession = Depends(get_db),
+    current_user_id: int = Depends(auth.get_current_user_id)
 ):
-    rows = (
-        db.query(models.Item.category, func.count(models.Item.id))
-        .filter(models.Item.owner_id == current_user.id)
-        .group_by(models.Item.category)
-        .all()
-    )
-    return [{"name": r[0], "count": r[1]} for r in rows if r[0]]
+    return await crud.get_category_counts(db, owner_id=current_user_id)
 
-@app.get("/items/by-category/{category}", response_model=list[schemas.ItemOut])
-def get_items_by_category(
+@app.get("/facets/list", response_model=schemas.FacetsOut)
+@app.get("/dashboard/summary", response_model=schemas.FacetsOut)
+async def dashboard_summary(
+    db: AsyncSession = Depends(get_db),
+    current_user_id: int = Depends(auth.get_current_user_id)
+):
+    return await crud.get_dashboard_summary(db, owner_id=current_user_id)
+
+@app.get("/items/by-category/{category}", response_model=list[schemas.ItemOut] | list[schemas.ItemListOut])
+async def get_items_by_category(
     category: str,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    after_id: Optional[int] = Query(None, ge=0),
+    compact: bool = Query(False),
+    db: AsyncSession = Depends(get_db),
+    current_user_id: int = Depends(auth.get_current_user_id)
 ):
-    return db.query(models.Item).filter(
-        models.Item.owner_id == current_user.id,
-        models.Item.category == category
-    ).all()
+    items = await crud.get_items(
+        db,
+        owner_id=current_user_id,
+        skip=skip,
+        limit=limit,
+        category=category,
+        compact=compact,
+        after_id=after_id
+    )
+    total = await crud.count_items(db, owner_id=current_user_id, category=category)
+    response.headers["X-Total-Count"] = str(total)
+    return _item_list(items, compact)
 
-@app.get("/items/by-room/{room}", response_model=list[schemas.ItemOut])
-def get_items_by_room(
+@app.get("/items/by-room/{room}", response_model=list[schemas.ItemOut] | list[schemas.ItemListOut])
+async def get_items_by_room(
     room: str,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(auth.get_current_user)
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    after_id: Optional[int] = Query(None, ge=0),
+    compact: bool = Query(False),
+    db: AsyncSession = Depends(get_db),
+    current_user_id: int = Depends(auth.get_current_user_id)
 ):
-    return db.query(models.Item).filter(
-        models.Item.owner_id == current_user.id,
-        models.Item.room == room
-    ).all()
+    items = await crud.get_items(
+        db,
+        owner_id=current_user_id,
+        skip=skip,
+        limit=limit,
+        room=room,
+        compact=compact,
+        after_id=after_id
+    )
+    total = await crud.count_items(db, owner_id=current_user_id, room=room)
+    response.headers["X-Total-Count"] = str(total)
+    return _item_list(items, compact)
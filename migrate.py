@@ -0,0 +1,30 @@
+"""Create or upgrade the database schema.
+
+Run once per deploy, before starting the app:
+
+    python migrate.py
+
+or set RUN_MIGRATIONS=1 to have the app run it at startup instead.
+"""
+from dotenv import load_dotenv
+load_dotenv()
+
+import asyncio
+
+import models
+from database import engine
+
+
+async def upgrade(bind=engine) -> None:
+    async with bind.begin() as conn:
+        await conn.run_sync(models.init_db)
+
+
+async def main() -> None:
+    await upgrade()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
+    print("✅ Database tables created/verified successfully")
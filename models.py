@@ -1,7 +1,24 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey
-from sqlalchemy.orm import relationship
+import hashlib
+
+from sqlalchemy import Column, Integer, String, Text, DateTime, Boolean, ForeignKey, Index, Computed, text
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from pgvector.sqlalchemy import Vector
+from sqlalchemy.orm import relationship, deferred
+from sqlalchemy.schema import CreateColumn
 from sqlalchemy.sql import func
 from database import Base
+from embeddings import EMBEDDING_DIM
+
+# Columns matched by crud.search_items' lower(col) LIKE substring search
+SEARCH_COLUMNS = ("name", "category", "room", "cupboard", "shelf", "inside_items", "notes", "image_name")
+
+# Full-text document over the same columns, materialized as a generated column
+SEARCH_TSV_EXPRESSION = "to_tsvector('simple', {})".format(
+    " || ' ' || ".join(f"coalesce({col}, '')" for col in SEARCH_COLUMNS)
+)
+# Stored as the search_tsv column comment so init_db can tell when the
+# expression above changed and the generated column must be rebuilt
+SEARCH_TSV_VERSION = hashlib.sha1(SEARCH_TSV_EXPRESSION.encode()).hexdigest()[:12]
 
 
 class User(Base):
@@ -33,9 +50,132 @@ class Item(Base):
     # owner (user) relationship
     owner_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     owner = relationship("User", backref="items")
+    # maintained by Postgres; deferred so list queries don't ship it
+    search_tsv = deferred(Column(
+        TSVECTOR,
+        Computed(SEARCH_TSV_EXPRESSION, persisted=True),
+        comment=SEARCH_TSV_VERSION,
+    ))
+
+    __table_args__ = (
+        Index("ix_items_search_tsv", "search_tsv", postgresql_using="gin"),
+        # per-user listings: paginated by id, filtered/grouped by room or
+        # category, looked up or sorted by name
+        Index("ix_items_owner_id_pk", "owner_id", "id"),
+        Index("ix_items_owner_room", "owner_id", "room"),
+        Index("ix_items_owner_category", "owner_id", "category"),
+        Index("ix_items_owner_name", "owner_id", "name"),
+    )
+
+
+class ItemImage(Base):
+    """Extra photos of an item; Item.image_* still holds the primary one."""
+    __tablename__ = "item_images"
+
+    id = Column(Integer, primary_key=True, index=True)
+    item_id = Column(Integer, ForeignKey("items.id", ondelete="CASCADE"), nullable=False, index=True)
+    image_name = Column(String(255), nullable=True)  # original filename
+    image_path = Column(String(255), nullable=False)  # public storage URL
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class ItemEmbedding(Base):
+    """Semantic search vector for an item (see embeddings.py).
+
+    A separate table so items works without the pgvector extension and
+    listings never carry the vector. No ANN index: searches are scoped to
+    one user's items and ranked exactly (see crud._nearest_items).
+    """
+    __tablename__ = "item_embeddings"
+
+    item_id = Column(Integer, ForeignKey("items.id", ondelete="CASCADE"), primary_key=True)
+    embedding = Column(Vector(EMBEDDING_DIM), nullable=False)
+
+
+def _pg_trgm_installed(ddl, target, bind, **kw) -> bool:
+    return (
+        bind is not None
+        and bind.dialect.name == "postgresql"
+        and bind.execute(text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")).first() is not None
+    )
+
+# GIN trigram indexes on lower(col) serve the '%term%' substring search for
+# tokens of 3+ characters (the "stand" in "tv stand", or "photo.jpg").
+# pg_trgm can't extract a trigram from shorter patterns, so a query made
+# only of 1-2 character tokens scans the owner's rows. Without pg_trgm
+# there is no fallback: a leading wildcard can't use a B-tree, and B-tree
+# rows on the Text columns would cap their length.
+for _col in SEARCH_COLUMNS:
+    _label = f"{_col}_lower"
+    _lowered = func.lower(Item.__table__.c[_col]).label(_label)
+    Index(
+        f"ix_items_{_col}_lower_trgm",
+        _lowered,
+        postgresql_using="gin",
+        postgresql_ops={_label: "gin_trgm_ops"},
+    ).ddl_if(callable_=_pg_trgm_installed)
 
 class Room(Base):
     __tablename__ = "rooms"
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(50), unique=True, nullable=False)
     description = Column(String(255), nullable=True)
+
+
+def _sync_search_tsv(conn) -> None:
+    """Add search_tsv, or rebuild it if it predates SEARCH_TSV_EXPRESSION.
+
+    A generated column's expression can't be altered in place, so a stale
+    one is dropped (taking its GIN index with it) and re-added; init_db
+    recreates the index afterwards.
+    """
+    version = conn.execute(text(
+        "SELECT col_description(a.attrelid, a.attnum) FROM pg_attribute a "
+        "WHERE a.attrelid = 'items'::regclass AND a.attname = 'search_tsv' "
+        "AND NOT a.attisdropped"
+    )).first()
+    if version is not None and version[0] == SEARCH_TSV_VERSION:
+        return
+    if version is not None:
+        print("⚠️ search_tsv expression changed, rebuilding column")
+        conn.execute(text("ALTER TABLE items DROP COLUMN search_tsv"))
+    column = CreateColumn(Item.__table__.c.search_tsv).compile(dialect=conn.dialect)
+    conn.execute(text(f"ALTER TABLE items ADD COLUMN {column}"))
+    conn.execute(text(f"COMMENT ON COLUMN items.search_tsv IS '{SEARCH_TSV_VERSION}'"))
+
+def init_db(conn) -> None:
+    """Create tables, plus any indexes create_all skips on existing tables.
+
+    Takes a sync Connection; from the async engine use
+    ``await conn.run_sync(init_db)``.
+    """
+    has_vector = False
+    if conn.dialect.name == "postgresql":
+        try:
+            with conn.begin_nested():
+                conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        except Exception as e:
+            print(f"⚠️ pg_trgm unavailable, substring search will scan: {e}")
+        try:
+            with conn.begin_nested():
+                conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+            has_vector = True
+        except Exception as e:
+            print(f"⚠️ pgvector unavailable, semantic image search disabled: {e}")
+    tables = [
+        table for table in Base.metadata.sorted_tables
+        if has_vector or table is not ItemEmbedding.__table__
+    ]
+    Base.metadata.create_all(bind=conn, tables=tables)
+    if conn.dialect.name == "postgresql":
+        _sync_search_tsv(conn)
+        # earlier versions created these without pg_trgm; they never served
+        # a query and reject long notes/inside_items values
+        for col in SEARCH_COLUMNS:
+            conn.execute(text(f"DROP INDEX IF EXISTS ix_items_{col}_lower_pattern"))
+    for table in tables:
+        for index in table.indexes:
+            index.create(bind=conn, checkfirst=True)
+    if conn.dialect.name == "postgresql":
+        # refresh planner statistics so new indexes are picked up
+        conn.execute(text("ANALYZE items"))
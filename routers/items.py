@@ -1,43 +0,0 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-import schemas, crud
-from database import SessionLocal
-
-router = APIRouter(prefix="/items", tags=["Items"])
-
-# Dependency
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-@router.post("/", response_model=schemas.ItemOut)
-def create_item(item: schemas.ItemCreate, db: Session = Depends(get_db)):
-    return crud.create_item(db, item)
-
-@router.get("/", response_model=list[schemas.ItemOut])
-def read_items(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return crud.get_items(db, skip=skip, limit=limit)
-
-@router.get("/{item_id}", response_model=schemas.ItemOut)
-def read_item(item_id: int, db: Session = Depends(get_db)):
-    db_item = crud.get_item(db, item_id)
-    if not db_item:
-        raise HTTPException(status_code=404, detail="Item not found")
-    return db_item
-
-@router.put("/{item_id}", response_model=schemas.ItemOut)
-def update_item(item_id: int, item: schemas.ItemUpdate, db: Session = Depends(get_db)):
-    db_item = crud.update_item(db, item_id, item)
-    if not db_item:
-        raise HTTPException(status_code=404, detail="Item not found")
-    return db_item
-
-@router.delete("/{item_id}")
-def delete_item(item_id: int, db: Session = Depends(get_db)):
-    db_item = crud.delete_item(db, item_id)
-    if not db_item:
-        raise HTTPException(status_code=404, detail="Item not found")
-    return {"message": "Item deleted"}
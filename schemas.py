@@ -30,6 +30,9 @@ class Token(BaseModel):
 class TokenData(BaseModel):
     email: Optional[str] = None
 
+class Message(BaseModel):
+    message: str
+
 class ItemBase(BaseModel):
     name: str
     category: Optional[str] = None
@@ -71,4 +74,34 @@ class ItemOut(ItemBase):
     image_path: Optional[str] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class ItemListOut(BaseModel):
+    """Slim item projection for list views (see ?compact=true)."""
+    id: int
+    name: str
+    category: Optional[str] = None
+    room: str
+    image_path: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+class ItemImageOut(BaseModel):
+    id: int
+    item_id: int
+    image_name: Optional[str] = None
+    image_path: str
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+# --- Aggregates ---
+class CountOut(BaseModel):
+    name: str
+    count: int
+
+class FacetsOut(BaseModel):
+    rooms: list[CountOut]
+    categories: list[CountOut]
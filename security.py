@@ -0,0 +1,97 @@
+import asyncio
+import math
+import os
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from passlib.context import CryptContext
+from passlib.hash import bcrypt_sha256
+
+# bcrypt cost calibration: aim for ~250ms per hash on the deployment host.
+# Set BCRYPT_ROUNDS to pin the cost and skip the startup benchmark.
+BCRYPT_TARGET_SECONDS = 0.25
+BCRYPT_MIN_ROUNDS = 10
+BCRYPT_MAX_ROUNDS = 15
+
+def _tune_bcrypt_rounds() -> int:
+    pinned = os.getenv("BCRYPT_ROUNDS")
+    if pinned:
+        return int(pinned)
+    handler = bcrypt_sha256.using(rounds=BCRYPT_MIN_ROUNDS)
+    samples = []
+    for _ in range(3):
+        start = time.perf_counter()
+        handler.hash("x")
+        samples.append(time.perf_counter() - start)
+    # every extra round doubles the work factor
+    extra = round(math.log2(BCRYPT_TARGET_SECONDS / statistics.median(samples)))
+    return max(BCRYPT_MIN_ROUNDS, min(BCRYPT_MAX_ROUNDS, BCRYPT_MIN_ROUNDS + extra))
+
+# New hashes use bcrypt_sha256; legacy bcrypt / pbkdf2_sha256 hashes still
+# verify and are upgraded on the next successful login. The bcrypt_sha256
+# cost is calibrated lazily (see _calibrated_rounds), not at import.
+pwd_context = CryptContext(
+    schemes=["bcrypt_sha256", "bcrypt", "pbkdf2_sha256"],
+    deprecated="auto",
+)
+
+# bcrypt is pure CPU and holds the GIL, so hash/verify run in worker processes
+# instead of tying up one of the event loop's limited threadpool slots.
+HASH_POOL = ProcessPoolExecutor(max_workers=os.cpu_count())
+
+# Calibrated cost, applied per process: workers get it with every call
+_rounds: Optional[int] = None
+# Checked against when a login email is unknown, so a miss costs the same
+# bcrypt work as a wrong password and response timing doesn't reveal which
+# emails are registered.
+_dummy_hash: Optional[str] = None
+_calibrate_lock = asyncio.Lock()
+
+def _use_rounds(rounds: int) -> None:
+    global _rounds
+    if _rounds != rounds:
+        pwd_context.update(bcrypt_sha256__rounds=rounds)
+        _rounds = rounds
+
+def _hash_password(password: str, rounds: int) -> str:
+    _use_rounds(rounds)
+    return pwd_context.hash(password)
+
+def _verify_and_update(password: str, hashed: str, rounds: int) -> tuple[bool, Optional[str]]:
+    _use_rounds(rounds)
+    return pwd_context.verify_and_update(password, hashed)
+
+async def _calibrated_rounds() -> int:
+    """Benchmark bcrypt and build the dummy hash once, in the hash pool."""
+    global _dummy_hash
+    if _rounds is None:
+        async with _calibrate_lock:
+            if _rounds is None:
+                loop = asyncio.get_running_loop()
+                rounds = await loop.run_in_executor(HASH_POOL, _tune_bcrypt_rounds)
+                _dummy_hash = await loop.run_in_executor(
+                    HASH_POOL, _hash_password, "not-a-real-password", rounds
+                )
+                _use_rounds(rounds)
+    return _rounds
+
+async def hash_password(password: str) -> str:
+    rounds = await _calibrated_rounds()
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(HASH_POOL, _hash_password, password, rounds)
+
+async def verify_and_update(password: str, hashed: str) -> tuple[bool, Optional[str]]:
+    rounds = await _calibrated_rounds()
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(HASH_POOL, _verify_and_update, password, hashed, rounds)
+
+async def verify_dummy(password: str) -> None:
+    """Spend a real verify's bcrypt time when there is no user to check."""
+    await _calibrated_rounds()
+    await verify_and_update(password, _dummy_hash)
+
+async def warm_up() -> None:
+    """Calibrate bcrypt and start a hash worker before the first login."""
+    await _calibrated_rounds()